@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import math, heapq, itertools, sys
+import math, heapq, itertools, json, multiprocessing, os, pickle, random, sys, time
+from array import array
 
 COLORS = {
     "bg": "white",
@@ -38,7 +39,21 @@ def load_graph_file(path):
             if (a,b) not in edges:
                 x1,y1 = coords[a]; x2,y2 = coords[b]
                 edges[(a,b)] = math.hypot(x1-x2, y1-y2)
-    return coords, edges
+    return coords, edges, build_adjacency(n, edges)
+
+def build_adjacency(n, edges):
+    degree = [0]*(n+1)
+    for a,b in edges:
+        degree[a+1] += 1
+        degree[b+1] += 1
+    offsets = array('q', itertools.accumulate(degree))
+    targets = array('q', bytes(8*offsets[-1]))
+    weights = array('d', bytes(8*offsets[-1]))
+    fill = offsets[:-1]
+    for (a,b),w in edges.items():
+        targets[fill[a]] = b; weights[fill[a]] = w; fill[a] += 1
+        targets[fill[b]] = a; weights[fill[b]] = w; fill[b] += 1
+    return offsets, targets, weights
 
 def reconstruct_path(came_from, start, goal):
     path = []
@@ -52,63 +67,290 @@ def reconstruct_path(came_from, start, goal):
             return []
     return list(reversed(path))
 
-def astar_generator(nodes, edges, start, goal, mode):
-    counter = itertools.count()
-    frontier = []
-    frontier_set = set()
+class IndexedHeap:
+    def __init__(self):
+        self.heap = []
+        self.pos = {}
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def push(self, item, priority):
+        i = self.pos.get(item)
+        if i is None:
+            self.heap.append([priority, next(self.counter), item])
+            self.pos[item] = len(self.heap)-1
+            self._sift_up(len(self.heap)-1)
+            return True
+        if priority < self.heap[i][0]:
+            self.heap[i][0] = priority
+            self._sift_up(i)
+            return True
+        return False
+
+    def pop(self):
+        heap, pos = self.heap, self.pos
+        top = heap[0]
+        last = heap.pop()
+        del pos[top[2]]
+        if heap:
+            heap[0] = last
+            pos[last[2]] = 0
+            self._sift_down(0)
+        return top[2], top[0]
+
+    def _sift_up(self, i):
+        heap, pos = self.heap, self.pos
+        entry = heap[i]
+        key = entry[0], entry[1]
+        while i > 0:
+            parent = (i-1) >> 1
+            p = heap[parent]
+            if (p[0], p[1]) <= key:
+                break
+            heap[i] = p
+            pos[p[2]] = i
+            i = parent
+        heap[i] = entry
+        pos[entry[2]] = i
+
+    def _sift_down(self, i):
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        entry = heap[i]
+        key = entry[0], entry[1]
+        while True:
+            child = 2*i+1
+            if child >= n:
+                break
+            c = heap[child]
+            if child+1 < n:
+                r = heap[child+1]
+                if (r[0], r[1]) < (c[0], c[1]):
+                    child, c = child+1, r
+            if key <= (c[0], c[1]):
+                break
+            heap[i] = c
+            pos[c[2]] = i
+            i = child
+        heap[i] = entry
+        pos[entry[2]] = i
+
+class HeapifyQueue:
+    def __init__(self):
+        self.heap = []
+        self.items = set()
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.items
+
+    def push(self, item, priority):
+        if item not in self.items:
+            heapq.heappush(self.heap, (priority, next(self.counter), item))
+            self.items.add(item)
+            return True
+        for i,entry in enumerate(self.heap):
+            if entry[2]==item and priority < entry[0]:
+                self.heap[i] = (priority, entry[1], item)
+                heapq.heapify(self.heap)
+                return True
+        return False
+
+    def pop(self):
+        priority,_,item = heapq.heappop(self.heap)
+        self.items.discard(item)
+        return item, priority
+
+def dijkstra(adj, source):
+    offsets, targets, weights = adj
+    dist = array('d', [math.inf])*(len(offsets)-1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for k in range(offsets[node], offsets[node+1]):
+            nd = d + weights[k]
+            nb = targets[k]
+            if nd < dist[nb]:
+                dist[nb] = nd
+                heapq.heappush(heap, (nd, nb))
+    return dist
+
+def build_landmarks(adj, count):
+    n = len(adj[0])-1
+    ids, tables = [], []
+    nearest = dijkstra(adj, 0)
+    for _ in range(min(count, n)):
+        far = max((i for i in range(n) if nearest[i] < math.inf and i not in ids), key=nearest.__getitem__, default=None)
+        if far is None:
+            break
+        table = dijkstra(adj, far)
+        ids.append(far)
+        tables.append(table)
+        nearest = table if len(ids) == 1 else array('d', map(min, nearest, table))
+    return ids, tables
+
+def load_landmarks(path, adj, count=8):
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size, count)
+    cache_path = path + ".alt"
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["key"] == key:
+            return cached["landmarks"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+        pass
+    landmarks = build_landmarks(adj, count)
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump({"key": key, "landmarks": landmarks}, f)
+    except OSError:
+        pass
+    return landmarks
+
+def make_heuristic(nodes, goal, landmarks=None):
+    gx, gy = nodes[goal]
+    hypot = math.hypot
+    if not landmarks:
+        def h(n):
+            x,y = nodes[n]
+            return hypot(x-gx, y-gy)
+        return h
+    pairs = [(table, table[goal]) for table in landmarks[1] if table[goal] < math.inf]
+    def h(n):
+        x,y = nodes[n]
+        best = hypot(x-gx, y-gy)
+        for table, tg in pairs:
+            d = tg - table[n]
+            if d < 0: d = -d
+            if d > best: best = d
+        return best
+    return h
+
+def astar_generator(nodes, adj, start, goal, mode, trace=True, queue=IndexedHeap, landmarks=None):
+    offsets, targets, weights = adj
+    h = make_heuristic(nodes, goal, landmarks)
+    frontier = queue()
     came_from = {}
-    gcost = {}
+    gcost = {start: 0.0}
     closed = set()
-    gcost[start] = 0.0
-    h = math.hypot(nodes[start][0]-nodes[goal][0], nodes[start][1]-nodes[goal][1]) if goal is not None else 0.0
-    f = h if mode=="best" else gcost[start]+h
-    heapq.heappush(frontier, (f, next(counter), start, 0.0))
-    frontier_set.add(start)
-    yield set(), set(frontier_set), None
+    frontier.push(start, h(start))
+    if trace:
+        yield None, [start], None
     while frontier:
-        f,_,node,g = heapq.heappop(frontier)
-        if node in closed:
-            continue
-        frontier_set.discard(node)
+        node,_ = frontier.pop()
         closed.add(node)
-        yield set(closed), set(frontier_set), node
         if node == goal:
-            path = reconstruct_path(came_from, start, goal)
-            yield set(closed), set(frontier_set), ("FOUND", path)
+            yield node, [], ("FOUND", reconstruct_path(came_from, start, goal), gcost[goal], len(closed))
             return
-        nbrs = []
-        for (a,b),w in edges.items():
-            if a==node: nbrs.append((b,w))
-            elif b==node: nbrs.append((a,w))
-        for nb,w in nbrs:
-            tentative_g = gcost.get(node, float('inf')) + w
+        added = []
+        g = gcost[node]
+        for k in range(offsets[node], offsets[node+1]):
+            nb = targets[k]
+            if nb in closed:
+                continue
+            tentative_g = g + weights[k]
             if mode == "astar":
-                if tentative_g < gcost.get(nb, float('inf')):
+                if tentative_g < gcost.get(nb, math.inf):
                     gcost[nb] = tentative_g
                     came_from[nb] = node
-                    hnb = math.hypot(nodes[nb][0]-nodes[goal][0], nodes[nb][1]-nodes[goal][1]) if goal is not None else 0.0
-                    fnb = hnb if mode=="best" else tentative_g + hnb
-                    if nb not in frontier_set:
-                        heapq.heappush(frontier, (fnb, next(counter), nb, tentative_g))
-                        frontier_set.add(nb)
-                    else:
-                        for i,entry in enumerate(frontier):
-                            if entry[2]==nb and fnb < entry[0]:
-                                frontier[i]=(fnb,entry[1],entry[2],tentative_g)
-                                heapq.heapify(frontier)
-                                break
-            else:
-                if nb not in came_from and nb not in closed:
-                    came_from[nb] = node
-                    hnb = math.hypot(nodes[nb][0]-nodes[goal][0], nodes[nb][1]-nodes[goal][1]) if goal is not None else 0.0
-                    fnb = hnb
-                    heapq.heappush(frontier, (fnb, next(counter), nb, tentative_g))
-                    frontier_set.add(nb)
-        yield set(closed), set(frontier_set), None
-    yield set(closed), set(), ("NOTFOUND", None)
+                    if trace and nb not in frontier:
+                        added.append(nb)
+                    frontier.push(nb, tentative_g + h(nb))
+            elif nb not in came_from:
+                gcost[nb] = tentative_g
+                came_from[nb] = node
+                if trace:
+                    added.append(nb)
+                frontier.push(nb, h(nb))
+        if trace:
+            yield node, added, None
+    yield None, [], ("NOTFOUND", None, math.inf, len(closed))
+
+def astar_search(nodes, adj, start, goal, mode="astar", queue=IndexedHeap, landmarks=None):
+    _, _, (_, path, cost, expanded) = next(astar_generator(nodes, adj, start, goal, mode, False, queue, landmarks))
+    return path or [], cost, expanded
+
+_worker_graph = None
+
+def _init_worker(nodes, adj, landmarks=None):
+    global _worker_graph
+    _worker_graph = nodes, adj, landmarks
+
+def _run_query(query):
+    start, goal, mode = query
+    nodes, adj, landmarks = _worker_graph
+    path, cost, expanded = astar_search(nodes, adj, start, goal, mode, landmarks=landmarks)
+    return {"start": start+1, "goal": goal+1, "mode": mode, "path": [n+1 for n in path],
+            "cost": cost if path else None, "expanded": expanded}
+
+def parse_queries(stream, n):
+    for lineno, line in enumerate(stream, 1):
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        try:
+            start, goal = int(parts[0])-1, int(parts[1])-1
+        except (IndexError, ValueError):
+            raise ValueError(f"line {lineno}: expected 'start goal [mode]'")
+        mode = parts[2] if len(parts) > 2 else "astar"
+        if mode not in ("astar", "best"):
+            raise ValueError(f"line {lineno}: unknown mode {mode!r}")
+        if not (0 <= start < n and 0 <= goal < n):
+            raise ValueError(f"line {lineno}: node out of range 1..{n}")
+        yield start, goal, mode
+
+def run_queries(nodes, adj, queries, workers=None, chunksize=64, landmarks=None):
+    if workers == 1:
+        _init_worker(nodes, adj, landmarks)
+        yield from map(_run_query, queries)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(nodes, adj, landmarks)) as pool:
+        yield from pool.imap(_run_query, queries, chunksize)
+
+def random_graph(n, seed=0):
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(n))
+    nodes = [(c*10+rng.randint(0,6), r*10+rng.randint(0,6)) for r in range(side) for c in range(side)]
+    edges = {}
+    for r in range(side):
+        for c in range(side):
+            a = r*side+c
+            for dr,dc in ((0,1),(1,0),(1,1),(1,-1)):
+                rr,cc = r+dr, c+dc
+                if rr<side and 0<=cc<side and rng.random()<0.85:
+                    b = rr*side+cc
+                    x1,y1 = nodes[a]; x2,y2 = nodes[b]
+                    edges[(min(a,b),max(a,b))] = math.hypot(x1-x2, y1-y2)
+    return nodes, edges, build_adjacency(len(nodes), edges)
+
+def benchmark_queues(sizes=(10_000, 100_000, 1_000_000), queries=3, seed=0):
+    print(f"{'nodes':>9} {'queue':>12} {'expanded':>10} {'time (s)':>9} {'exp/s':>10}")
+    for n in sizes:
+        nodes, edges, adj = random_graph(n, seed)
+        rng = random.Random(seed)
+        pairs = [tuple(rng.sample(range(len(nodes)), 2)) for _ in range(queries)]
+        for queue in (HeapifyQueue, IndexedHeap):
+            expanded = 0
+            t0 = time.perf_counter()
+            for s,g in pairs:
+                expanded += astar_search(nodes, adj, s, g, "astar", queue)[2]
+            dt = time.perf_counter()-t0
+            print(f"{len(nodes):>9} {queue.__name__:>12} {expanded:>10} {dt:>9.3f} {expanded/dt:>10.0f}")
 
 class GraphApp:
-    def __init__(self, root, nodes=None, edges=None):
+    def __init__(self, root, nodes=None, edges=None, adj=None, landmarks=None):
         self.root = root
         self.root.title("Best-First / A* Graph Pathfinder")
         self.canvas_w = 900
@@ -144,6 +386,8 @@ class GraphApp:
         self.canvas.bind("<Button-1>", self.on_click)
         self.nodes = nodes or []
         self.edges = edges or {}
+        self.adj = adj or build_adjacency(len(self.nodes), self.edges)
+        self.landmarks = landmarks
         self.node_items = {}
         self.edge_items = []
         self.node_r = 14
@@ -153,6 +397,7 @@ class GraphApp:
         self.running = False
         self.frontier = set()
         self.closed = set()
+        self.current = None
         self.path = []
         self.scale = 1.0
         self.offset_x = 0
@@ -225,7 +470,8 @@ class GraphApp:
         if self.start is None or self.goal is None:
             messagebox.showinfo("Info","Select start and goal nodes first")
             return
-        self.generator = astar_generator(self.nodes, self.edges, self.start, self.goal, "best" if self.alg.get()=="best" else "astar")
+        self.reset_search()
+        self.generator = astar_generator(self.nodes, self.adj, self.start, self.goal, "best" if self.alg.get()=="best" else "astar", landmarks=self.landmarks)
         self.running = True
         self.status.config(text=f"Running {self.alg.get().upper()}...")
         self.animate()
@@ -234,16 +480,14 @@ class GraphApp:
         if not self.running:
             return
         try:
-            closed, frontier, current = next(self.generator)
+            current, added, status = next(self.generator)
         except StopIteration:
             self.generator = None
             self.running = False
             return
-        self.closed = closed
-        self.frontier = frontier
-        if isinstance(current, tuple) and current and current[0] in ("FOUND","NOTFOUND"):
-            if current[0]=="FOUND":
-                self.path = current[1]
+        if status is not None:
+            if status[0]=="FOUND":
+                self.path = status[1]
                 for n in self.path:
                     nid,tid = self.node_items[n]
                     self.canvas.itemconfig(nid, fill=COLORS["path"])
@@ -253,24 +497,29 @@ class GraphApp:
             self.generator = None
             self.running = False
             return
-        self.draw_search_state(current)
+        self.draw_search_state(current, added)
         delay = max(10, int(self.delay.get()))
         self.root.after(delay, self.animate)
 
-    def draw_search_state(self, current=None):
-        for (a,b), id in self.edge_items:
-            self.canvas.itemconfig(id, fill=COLORS["edge"], width=2)
-        for i,(nid,tid) in self.node_items.items():
-            color = COLORS["node"]
-            if i in self.closed: color = COLORS["visited"]
-            if i in self.frontier: color = COLORS["frontier"]
-            if i==self.start: color = COLORS["start"]
-            if i==self.goal: color = COLORS["goal"]
-            if i in self.path: color = COLORS["path"]
-            if current is not None and i==current: color = COLORS["frontier"]
-            self.canvas.itemconfig(nid, fill=color)
-        for i,(nid,tid) in self.node_items.items():
-            self.canvas.tag_raise(tid)
+    def node_color(self, i):
+        if i==self.goal: return COLORS["goal"]
+        if i==self.start: return COLORS["start"]
+        if i in self.frontier: return COLORS["frontier"]
+        if i in self.closed: return COLORS["visited"]
+        return COLORS["node"]
+
+    def draw_search_state(self, current, added):
+        previous, self.current = self.current, current
+        if current is not None:
+            self.frontier.discard(current)
+            self.closed.add(current)
+        self.frontier.update(added)
+        for i in added:
+            self.canvas.itemconfig(self.node_items[i][0], fill=self.node_color(i))
+        if previous is not None:
+            self.canvas.itemconfig(self.node_items[previous][0], fill=self.node_color(previous))
+        if current is not None:
+            self.canvas.itemconfig(self.node_items[current][0], fill=COLORS["frontier"])
         self.status.config(text=f"Expanded: {len(self.closed)} Frontier: {len(self.frontier)}")
 
     def reset_search(self):
@@ -278,6 +527,7 @@ class GraphApp:
         self.running = False
         self.frontier = set()
         self.closed = set()
+        self.current = None
         self.path = []
         self.status.config(text="")
         self.update_node_colors()
@@ -286,12 +536,33 @@ def main():
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("graphfile", nargs="?")
+    parser.add_argument("--bench", action="store_true", help="compare priority queues on synthetic graphs")
+    parser.add_argument("--queries", help="answer 'start goal [astar|best]' lines from file ('-' for stdin) without GUI")
+    parser.add_argument("--output", default="-", help="JSON lines output for --queries ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --queries")
+    parser.add_argument("--landmarks", type=int, default=0, help="use an ALT heuristic with this many landmarks, cached as <graphfile>.alt")
     args = parser.parse_args()
+    if args.bench:
+        benchmark_queues()
+        return
+    if args.queries:
+        if not args.graphfile:
+            parser.error("--queries requires graphfile")
+        nodes, edges, adj = load_graph_file(args.graphfile)
+        landmarks = load_landmarks(args.graphfile, adj, args.landmarks) if args.landmarks else None
+        src = sys.stdin if args.queries == "-" else open(args.queries, "r", encoding="utf-8")
+        dst = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        with src, dst:
+            for result in run_queries(nodes, adj, parse_queries(src, len(nodes)), args.workers, landmarks=landmarks):
+                dst.write(json.dumps(result) + "\n")
+        return
     root = tk.Tk()
-    nodes, edges = [], {}
+    nodes, edges, adj, landmarks = [], {}, None, None
     if args.graphfile:
         try:
-            nodes, edges = load_graph_file(args.graphfile)
+            nodes, edges, adj = load_graph_file(args.graphfile)
+            if args.landmarks:
+                landmarks = load_landmarks(args.graphfile, adj, args.landmarks)
         except Exception as e:
             messagebox.showerror("Error", str(e))
             sys.exit(1)
@@ -301,10 +572,12 @@ def main():
         root.deiconify()
         if path:
             try:
-                nodes, edges = load_graph_file(path)
+                nodes, edges, adj = load_graph_file(path)
+                if args.landmarks:
+                    landmarks = load_landmarks(path, adj, args.landmarks)
             except Exception as e:
                 messagebox.showerror("Error", str(e))
-    app = GraphApp(root, nodes, edges)
+    app = GraphApp(root, nodes, edges, adj, landmarks)
     root.mainloop()
 
 if __name__=="__main__":
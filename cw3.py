@@ -1,45 +1,294 @@
+import argparse
+import itertools
+import json
+import multiprocessing
 import random
+import time
+import numpy as np
+
+def pair_counts(keys, size):
+    rows = keys.shape[0]
+    counts = np.bincount((keys + np.arange(rows)[:, None]*size).ravel(), minlength=rows*size).reshape(rows, size)
+    return (counts*(counts-1)//2).sum(axis=1)
+
+def population_fitness(population):
+    n = population.shape[1]
+    i = np.arange(n)
+    return pair_counts(population, n) + pair_counts(population - i + n - 1, 2*n - 1) + pair_counts(population + i, 2*n - 1)
 
 def fitness(board):
-    n = len(board)
-    attacks = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            if board[i] == board[j] or abs(board[i] - board[j]) == abs(i - j):
-                attacks += 1
-    return attacks
-
-def crossover(p1, p2):
-    n = len(p1)
-    a, b = sorted(random.sample(range(n), 2))
-    c1 = p1[:a] + p2[a:b] + p1[b:]
-    c2 = p2[:a] + p1[a:b] + p2[b:]
+    return int(population_fitness(np.asarray(board)[None, :])[0])
+
+def crossover(p1, p2, rng):
+    m, n = p1.shape
+    a = rng.integers(0, n, m)
+    b = rng.integers(0, n - 1, m)
+    b += b >= a
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    cols = np.arange(n)
+    mask = (cols >= lo[:, None]) & (cols < hi[:, None])
+    c1 = np.where(mask, p2, p1)
+    c2 = np.where(mask, p1, p2)
     return c1, c2
 
-def mutate(board, rate):
-    n = len(board)
-    if random.random() < rate:
-        i = random.randint(0, n - 1)
-        board[i] = random.randint(0, n - 1)
+def uniform_crossover(p1, p2, rng):
+    mask = rng.random(p1.shape) < 0.5
+    return np.where(mask, p2, p1), np.where(mask, p1, p2)
+
+def roulette_selection(fit, pairs, rng):
+    weights = 1 / (1 + fit)
+    return rng.choice(len(fit), size=(pairs, 2), p=weights / weights.sum())
+
+def tournament_selection(fit, pairs, rng, size=3):
+    entrants = rng.integers(0, len(fit), (pairs, 2, size))
+    winners = np.argmin(fit[entrants], axis=-1)
+    return np.take_along_axis(entrants, winners[..., None], axis=-1)[..., 0]
+
+SELECTIONS = {"roulette": roulette_selection, "tournament": tournament_selection}
+CROSSOVERS = {"two_point": crossover, "uniform": uniform_crossover}
+
+def mutate(board, rate, rng):
+    m, n = board.shape
+    rows = np.flatnonzero(rng.random(m) < rate)
+    board[rows, rng.integers(0, n, len(rows))] = rng.integers(0, n, len(rows))
     return board
 
-def genetic_n_queens(n=8, pop_size=500, mutation_rate=0.2, max_iter=10000):
-    population = [[random.randint(0, n - 1) for i in range(n)] for i in range(pop_size)]
-    for iteration in range(max_iter):
-        population.sort(key=fitness)
-        print(fitness(population[0]))
-        if fitness(population[0]) == 0:
-            return population[0]
-        new_population = population[:pop_size // 2]
-        while len(new_population) < pop_size:
-            p1, p2 = random.choices(population, weights=[1/(1+fitness(b)) for b in population], k=2)
-            c1, c2 = crossover(p1, p2)
-            new_population.append(mutate(c1, mutation_rate))
-            if len(new_population) < pop_size:
-                new_population.append(mutate(c2, mutation_rate))
-        population = new_population
+def rank(population):
+    fit = population_fitness(population)
+    order = np.argsort(fit, kind="stable")
+    return population[order], fit[order]
+
+def next_generation(population, fit, mutation_rate, rng, selection="roulette", crossover_type="two_point"):
+    pop_size, n = population.shape
+    elite = pop_size // 2
+    pairs = (pop_size - elite + 1) // 2
+    parents = SELECTIONS[selection](fit, pairs, rng)
+    c1, c2 = CROSSOVERS[crossover_type](population[parents[:, 0]], population[parents[:, 1]], rng)
+    children = np.empty((2*pairs, n), dtype=population.dtype)
+    children[0::2], children[1::2] = c1, c2
+    return np.concatenate((population[:elite], mutate(children[:pop_size - elite], mutation_rate, rng)))
+
+class GATelemetry:
+    FIELDS = ("generation", "best", "mean", "diversity", "seconds")
+
+    def __init__(self, interval=1, path=None, callback=None):
+        self.interval = interval
+        self.path = path
+        self.callback = callback
+        self.history = np.zeros((0, len(self.FIELDS)))
+        self.count = 0
+
+    def reserve(self, max_iter):
+        self.history = np.zeros((max_iter, len(self.FIELDS)))
+        self.count = 0
+
+    def record(self, generation, population, fit, seconds):
+        row = self.history[self.count]
+        row[:] = generation, fit[0], fit.mean(), np.mean(population != population[0]), seconds
+        self.count += 1
+        if self.callback and generation % self.interval == 0:
+            self.callback(dict(zip(self.FIELDS, [generation] + row[1:].tolist())))
+
+    @property
+    def rows(self):
+        return self.history[:self.count]
+
+    def finish(self):
+        if not self.path:
+            return
+        rows = [[int(row[0])] + row[1:] for row in self.rows[::self.interval].tolist()]
+        with open(self.path, "w", encoding="utf-8") as f:
+            if self.path.endswith(".jsonl"):
+                f.writelines(json.dumps(dict(zip(self.FIELDS, row))) + "\n" for row in rows)
+            else:
+                f.write(",".join(self.FIELDS) + "\n")
+                f.writelines(",".join(map(repr, row)) + "\n" for row in rows)
+
+def genetic_n_queens(n=8, pop_size=500, mutation_rate=0.2, max_iter=10000, seed=None, telemetry=None,
+                     selection="roulette", crossover_type="two_point"):
+    rng = np.random.default_rng(seed)
+    population = rng.integers(0, n, (pop_size, n))
+    if telemetry:
+        telemetry.reserve(max_iter)
+    try:
+        for iteration in range(max_iter):
+            t0 = time.perf_counter()
+            ranked, fit = rank(population)
+            solved = fit[0] == 0
+            if not solved:
+                population = next_generation(ranked, fit, mutation_rate, rng, selection, crossover_type)
+            if telemetry:
+                telemetry.record(iteration, ranked, fit, time.perf_counter() - t0)
+            if solved:
+                return ranked[0].tolist()
+        return None
+    finally:
+        if telemetry:
+            telemetry.finish()
+
+def island_epoch(task):
+    population, rng, generations, mutation_rate = task
+    for _ in range(generations):
+        population, fit = rank(population)
+        if fit[0] == 0:
+            break
+        population = next_generation(population, fit, mutation_rate, rng)
+    else:
+        population, fit = rank(population)
+    return population, fit, rng
+
+def migrate(populations, migrants, topology, rng):
+    k = len(populations)
+    best = [pop[:migrants].copy() for pop in populations]
+    for i in range(k):
+        if topology == "ring":
+            target = (i + 1) % k
+        else:
+            target = (i + 1 + int(rng.integers(k - 1))) % k
+        populations[target][-migrants:] = best[i]
+
+def island_n_queens(n=8, islands=4, pop_size=500, mutation_rate=0.2, max_iter=10000,
+                    migration_interval=50, migrants=5, topology="ring", seed=None, island_seeds=None, processes=None):
+    if island_seeds is not None and len(island_seeds) != islands:
+        raise ValueError("island_seeds must have one seed per island")
+    seeds = np.random.SeedSequence(seed).spawn(islands + 1)
+    master = np.random.default_rng(seeds[0])
+    rngs = [np.random.default_rng(s) for s in (island_seeds or seeds[1:])]
+    populations = [rng.integers(0, n, (pop_size, n)) for rng in rngs]
+    with multiprocessing.Pool(processes or min(islands, multiprocessing.cpu_count())) as pool:
+        done = 0
+        while done < max_iter:
+            generations = min(migration_interval, max_iter - done)
+            results = pool.map(island_epoch, [(pop, rng, generations, mutation_rate) for pop, rng in zip(populations, rngs)])
+            populations, fits, rngs = (list(r) for r in zip(*results))
+            for pop, fit in zip(populations, fits):
+                if fit[0] == 0:
+                    return pop[0].tolist()
+            done += generations
+            if islands > 1:
+                migrate(populations, migrants, topology, master)
     return None
 
+class QueenBoard:
+    def __init__(self, board):
+        self.n = n = len(board)
+        self.board = np.array(board)
+        i = np.arange(n)
+        self.rows = np.bincount(self.board, minlength=n)
+        self.diag = np.bincount(self.board - i + n - 1, minlength=2*n - 1)
+        self.anti = np.bincount(self.board + i, minlength=2*n - 1)
+        self.conflicts = int(sum((c*(c-1)//2).sum() for c in (self.rows, self.diag, self.anti)))
+
+    def attacked(self, col):
+        row = self.board[col]
+        return self.rows[row] > 1 or self.diag[row - col + self.n - 1] > 1 or self.anti[row + col] > 1
+
+    def move(self, col, row):
+        old = self.board[col]
+        if old == row:
+            return
+        n = self.n
+        for counts, a, b in ((self.rows, old, row), (self.diag, old - col + n - 1, row - col + n - 1), (self.anti, old + col, row + col)):
+            counts[a] -= 1
+            self.conflicts += int(counts[b] - counts[a])
+            counts[b] += 1
+        self.board[col] = row
+
+    def swap(self, i, j):
+        ri, rj = self.board[i], self.board[j]
+        self.move(i, rj)
+        self.move(j, ri)
+
+    def conflicted(self):
+        b, n = self.board, self.n
+        i = np.arange(n)
+        return np.flatnonzero((self.rows[b] > 1) | (self.diag[b - i + n - 1] > 1) | (self.anti[b + i] > 1)).tolist()
+
+def initial_permutation(n, rng, tries=50):
+    perm = list(range(n))
+    rng.shuffle(perm)
+    diag, anti = [0]*(2*n - 1), [0]*(2*n - 1)
+    random_ = rng.random
+    for i in range(n):
+        for _ in range(tries):
+            j = i + int(random_()*(n - i))
+            r = perm[j]
+            if not diag[r - i + n - 1] and not anti[r + i]:
+                perm[i], perm[j] = r, perm[i]
+                break
+        diag[perm[i] - i + n - 1] += 1
+        anti[perm[i] + i] += 1
+    return perm
+
+def min_conflicts_n_queens(n=8, max_steps=None, seed=None):
+    rng = random.Random(seed)
+    max_steps = 100*n + 100000 if max_steps is None else max_steps
+    qb = QueenBoard(initial_permutation(n, rng))
+    conflicted = []
+    best, stall = qb.conflicts, 0
+    for step in range(max_steps):
+        if not qb.conflicts:
+            return qb.board.tolist()
+        if stall > 20*n + 100:
+            qb = QueenBoard(initial_permutation(n, rng))
+            conflicted = []
+            best, stall = qb.conflicts, 0
+            continue
+        if not conflicted:
+            conflicted = qb.conflicted()
+            rng.shuffle(conflicted)
+        i = conflicted.pop()
+        if not qb.attacked(i):
+            continue
+        before = qb.conflicts
+        j = int(rng.random()*n)
+        qb.swap(i, j)
+        if qb.conflicts > before:
+            qb.swap(i, j)
+            conflicted.append(i)
+        elif qb.attacked(j):
+            conflicted.append(j)
+        if qb.conflicts < best:
+            best, stall = qb.conflicts, 0
+        else:
+            stall += 1
+    return qb.board.tolist() if not qb.conflicts else None
+
+BENCH_FIELDS = ("n", "pop_size", "mutation_rate", "selection", "crossover", "seed", "solved", "generations", "seconds")
+
+def bench_run(task):
+    n, pop_size, mutation_rate, selection, crossover_type, seed, max_iter = task
+    telemetry = GATelemetry(interval=0)
+    t0 = time.perf_counter()
+    result = genetic_n_queens(n, pop_size, mutation_rate, max_iter, seed, telemetry, selection, crossover_type)
+    return task[:6] + (result is not None, telemetry.count, time.perf_counter() - t0)
+
+def benchmark(ns=(8, 12, 16), pop_sizes=(100, 500), mutation_rates=(0.1, 0.2), selections=tuple(SELECTIONS),
+              crossovers=tuple(CROSSOVERS), seeds=range(10), max_iter=2000, processes=None, path="ga_bench.csv"):
+    configs = list(itertools.product(ns, pop_sizes, mutation_rates, selections, crossovers))
+    tasks = [config + (seed, max_iter) for config in configs for seed in seeds]
+    with multiprocessing.Pool(processes) as pool:
+        runs = pool.map(bench_run, tasks)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(BENCH_FIELDS) + "\n")
+        f.writelines(",".join(map(str, run)) + "\n" for run in runs)
+    summary_path = path[:-4] + "_summary.csv" if path.endswith(".csv") else path + ".summary.csv"
+    header = ("n", "pop_size", "mutation_rate", "selection", "crossover", "runs", "success_rate",
+              "median_generations", "median_seconds", "p10_seconds", "p90_seconds")
+    print(" ".join(f"{h:>12}" for h in header))
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        for config in configs:
+            group = [run for run in runs if run[:5] == config]
+            solved = [run for run in group if run[6]]
+            seconds = np.array([run[8] for run in solved]) if solved else np.array([np.nan])
+            row = config + (len(group), len(solved) / len(group),
+                            float(np.median([run[7] for run in solved])) if solved else np.nan,
+                            *np.percentile(seconds, [50, 10, 90]).tolist())
+            f.write(",".join(map(str, row)) + "\n")
+            print(" ".join(f"{v:>12.4g}" if isinstance(v, float) else f"{v:>12}" for v in row))
+    return runs
+
 def print_board(board):
     n = len(board)
     print("   " + "".join(chr(ord('A') + i) for i in range(n)))
@@ -49,12 +298,37 @@ def print_board(board):
         print(f"{i+1:2d} " + "".join(row))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="sweep GA parameters over many seeds instead of solving interactively")
+    parser.add_argument("--n", type=int, nargs="+", default=[8, 12, 16])
+    parser.add_argument("--pop", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--mutation", type=float, nargs="+", default=[0.1, 0.2])
+    parser.add_argument("--selection", nargs="+", choices=SELECTIONS, default=list(SELECTIONS))
+    parser.add_argument("--crossover", nargs="+", choices=CROSSOVERS, default=list(CROSSOVERS))
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--max-iter", type=int, default=2000)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--out", default="ga_bench.csv")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.n, args.pop, args.mutation, args.selection, args.crossover, range(args.seeds),
+                  args.max_iter, args.processes, args.out)
+        raise SystemExit
     N = int(input("Podaj N: "))
+    method = input("Metoda ('ga' algorytm genetyczny, 'is' model wyspowy, 'mc' min-conflicts):\n").strip().lower()
     if N in (2, 3):
         print("Brak rozwiązań dla N=2 i N=3.")
     else:
-        result = genetic_n_queens(N)
-        if result:
+        if method == 'mc':
+            result = min_conflicts_n_queens(N)
+        elif method == 'is':
+            result = island_n_queens(N)
+        else:
+            progress = GATelemetry(interval=100, callback=lambda row: print(f"{row['generation']}: {row['best']:.0f}"))
+            result = genetic_n_queens(N, telemetry=progress)
+        if result and N > 100:
+            print(f"Znaleziono rozwiązanie dla N={N}.")
+        elif result:
             print("Rozwiązanie:", result)
             print_board(result)
         else:
@@ -1,6 +1,225 @@
 import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
+import argparse
 import math
+import queue
+import random
+import sys
+import threading
+import time
+
+TT_SIZE = 500000
+EXACT, LOWER, UPPER = 0, 1, 2
+TARGET = 3
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+POLL_MS = 50
+MARKS = {1: 'O', -1: 'X'}
+
+class SearchTimeout(Exception):
+    pass
+
+class Engine:
+    def __init__(self, size, target=TARGET, seed=None):
+        n = size
+        self.size = n
+        # Heuristic lines: rows, columns and the two main diagonals.
+        lines = [[r*n + c for c in range(n)] for r in range(n)] + [[r*n + c for r in range(n)] for c in range(n)]
+        lines += [[i*n + i for i in range(n)], [i*n + n - 1 - i for i in range(n)]]
+        self.cell_lines = [[k for k, line in enumerate(lines) if i in line] for i in range(n*n)]
+        self.cell_wins = [[] for _ in range(n*n)]
+        for r in range(n):
+            for c in range(n):
+                for dr, dc in DIRECTIONS:
+                    if 0 <= r + dr*(target - 1) < n and 0 <= c + dc*(target - 1) < n:
+                        segment = [(r + dr*k)*n + c + dc*k for k in range(target)]
+                        mask = sum(1 << i for i in segment)
+                        for i in segment:
+                            self.cell_wins[i].append(mask)
+        centre = (n - 1) / 2
+        self.move_order = sorted(range(n*n), key=lambda i: abs(i // n - centre) + abs(i % n - centre))
+        rng = random.Random(seed)
+        self.zobrist = {side: [rng.getrandbits(64) for _ in range(n*n)] for side in (1, -1)}
+        self.bits = {1: 0, -1: 0}
+        self.counts = {1: [0] * len(lines), -1: [0] * len(lines)}
+        self.score = 0
+        self.hash = 0
+        self.empty = n * n
+        self.winner = 0
+        self.stack = []
+        self.tt = OrderedDict()
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.tt_cutoffs = 0
+        self.nodes = 0
+        self.completed_depth = 0
+        self.cancel = threading.Event()
+        self.deadline = math.inf
+
+    def occupied(self):
+        return self.bits[1] | self.bits[-1]
+
+    def line_value(self, line):
+        mine, theirs = self.counts[1][line], self.counts[-1][line]
+        return (mine*mine if not theirs else 0) - (theirs*theirs if not mine else 0)
+
+    def update(self, i, side, delta):
+        counts = self.counts[side]
+        for line in self.cell_lines[i]:
+            before = self.line_value(line)
+            counts[line] += delta
+            self.score += self.line_value(line) - before
+        self.bits[side] ^= 1 << i
+        self.hash ^= self.zobrist[side][i]
+        self.empty -= delta
+
+    def make(self, i, side):
+        self.stack.append((i, side, self.winner))
+        self.update(i, side, 1)
+        if not self.winner:
+            bits = self.bits[side]
+            if any(bits & mask == mask for mask in self.cell_wins[i]):
+                self.winner = side
+
+    def undo(self):
+        i, side, self.winner = self.stack.pop()
+        self.update(i, side, -1)
+
+    def tt_store(self, key, entry):
+        self.tt[key] = entry
+        self.tt.move_to_end(key)
+        if len(self.tt) > TT_SIZE:
+            self.tt.popitem(last=False)
+
+    def tt_stats(self):
+        memory = sys.getsizeof(self.tt) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.tt.items())
+        return {"entries": len(self.tt), "probes": self.tt_probes, "hits": self.tt_hits, "cutoffs": self.tt_cutoffs,
+                "hit_rate": self.tt_hits / self.tt_probes if self.tt_probes else 0.0, "bytes": memory}
+
+    def ordered_moves(self, depth, tt_move=None):
+        occupied = self.occupied()
+        moves = [tt_move] if tt_move is not None and not occupied >> tt_move & 1 else []
+        moves += [m for m in self.killers[depth] if not occupied >> m & 1 and m not in moves]
+        moves += [m for m in self.move_order if not occupied >> m & 1 and m not in moves]
+        return moves
+
+    def store_killer(self, depth, move):
+        killers = self.killers[depth]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+
+    def minimax(self, depth, side, alpha=-math.inf, beta=math.inf):
+        self.nodes += 1
+        if not self.nodes & 255 and (self.cancel.is_set() or time.perf_counter() > self.deadline):
+            raise SearchTimeout
+        self.tt_probes += 1
+        key = self.hash
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry:
+            self.tt_hits += 1
+            self.tt.move_to_end(key)
+            score, flag, tt_move, search_id = entry
+            # Scores depend on the root position, side and depth limit, so entries from
+            # other searches only contribute their best move for ordering.
+            if search_id == self.search_id and (flag == EXACT or (flag == LOWER and score >= beta)
+                                                or (flag == UPPER and score <= alpha)):
+                self.tt_cutoffs += 1
+                return score, tt_move
+        if self.winner:
+            return (1000 - depth if self.winner == self.me else -1000 + depth), None
+        if not self.empty:
+            return 0, None
+        if depth >= self.max_depth:
+            return self.me * self.score, None
+        maximizing = side == self.me
+        best_score = -math.inf if maximizing else math.inf
+        best_move = None
+        alpha0, beta0 = alpha, beta
+        for move in self.ordered_moves(depth, tt_move):
+            self.make(move, side)
+            score, _ = self.minimax(depth+1, -side, alpha, beta)
+            self.undo()
+            if maximizing:
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                alpha = max(alpha, score)
+            else:
+                if score < best_score:
+                    best_score = score
+                    best_move = move
+                beta = min(beta, score)
+            if alpha >= beta:
+                self.store_killer(depth, move)
+                break
+        flag = UPPER if best_score <= alpha0 else LOWER if best_score >= beta0 else EXACT
+        self.tt_store(key, (best_score, flag, best_move, self.search_id))
+        return best_score, best_move
+
+    def find_best_move(self, side, max_depth, deadline=math.inf):
+        self.me = side
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self.nodes = 1
+        self.killers = [[] for _ in range(max_depth + 1)]
+        if max_depth <= 0 or self.winner or not self.empty:
+            return None
+        self.search_id = (self.empty, side, max_depth)
+        entry = self.tt.get(self.hash)
+        # Plain minimax keeps the first row-major move among equal scores, so moves
+        # before the current best only need to tie it and later ones must beat it.
+        best_score = -math.inf
+        best_move = None
+        for move in self.ordered_moves(0, entry and entry[2]):
+            earlier = best_move is not None and move < best_move
+            self.make(move, side)
+            score, _ = self.minimax(1, -side, best_score - 1 if earlier else best_score)
+            self.undo()
+            if score > best_score or (earlier and score == best_score):
+                best_score = score
+                best_move = move
+        return best_move
+
+    def iterative_deepening(self, side, max_depth, budget):
+        # Depth 1 always completes so there is a move even with a tiny budget; deeper
+        # iterations are abandoned at the deadline and the last finished depth wins.
+        deadline = time.perf_counter() + budget
+        ply = len(self.stack)
+        best_move = self.find_best_move(side, 1)
+        self.completed_depth = 1
+        for depth in range(2, max_depth + 1):
+            if time.perf_counter() >= deadline:
+                break
+            try:
+                best_move = self.find_best_move(side, depth, deadline)
+            except SearchTimeout:
+                while len(self.stack) > ply:
+                    self.undo()
+                break
+            self.completed_depth = depth
+        self.deadline = math.inf
+        return best_move
+
+def benchmark(sizes=(3, 5, 7, 10), depths=(1, 2, 3, 4), max_moves=20, seed=0):
+    print(f"{'size':>4} {'depth':>5} {'moves':>5} {'nodes':>9} {'nodes/s':>10} {'mean ms':>8} {'max ms':>8}")
+    for size in sizes:
+        for depth in depths:
+            engine = Engine(size, seed=seed)
+            side = 1
+            nodes = 0
+            latencies = []
+            while not engine.winner and engine.empty and len(latencies) < max_moves:
+                t0 = time.perf_counter()
+                move = engine.find_best_move(side, depth)
+                latencies.append(time.perf_counter() - t0)
+                nodes += engine.nodes
+                engine.make(move, side)
+                side = -side
+            total = sum(latencies)
+            print(f"{size:>4} {depth:>5} {len(latencies):>5} {nodes:>9} {nodes / total:>10.0f} "
+                  f"{1000 * total / len(latencies):>8.2f} {1000 * max(latencies):>8.2f}")
 
 class TicTacToe:
     def __init__(self, root):
@@ -16,26 +235,37 @@ class TicTacToe:
         self.depth_var = tk.IntVar(value=6)
         self.depth_spin = ttk.Spinbox(control_frame, from_=1, to=20, width=5, textvariable=self.depth_var)
         self.depth_spin.grid(row=0, column=3, padx=5)
-        ttk.Label(control_frame, text="Pierwszy gracz:").grid(row=0, column=4, padx=5)
+        ttk.Label(control_frame, text="Czas na ruch [s]:").grid(row=0, column=4, padx=5)
+        self.time_var = tk.DoubleVar(value=2.0)
+        self.time_spin = ttk.Spinbox(control_frame, from_=0.1, to=60, increment=0.5, width=5, textvariable=self.time_var)
+        self.time_spin.grid(row=0, column=5, padx=5)
+        ttk.Label(control_frame, text="Pierwszy gracz:").grid(row=0, column=6, padx=5)
         self.first_var = tk.StringVar(value="user")
-        ttk.Radiobutton(control_frame, text="Użytkownik", variable=self.first_var, value="user").grid(row=0, column=5, padx=2)
-        ttk.Radiobutton(control_frame, text="Komputer", variable=self.first_var, value="computer").grid(row=0, column=6, padx=2)
-        ttk.Button(control_frame, text="Nowa gra", command=self.new_game).grid(row=0, column=7, padx=10)
+        ttk.Radiobutton(control_frame, text="Użytkownik", variable=self.first_var, value="user").grid(row=0, column=7, padx=2)
+        ttk.Radiobutton(control_frame, text="Komputer", variable=self.first_var, value="computer").grid(row=0, column=8, padx=2)
+        ttk.Button(control_frame, text="Nowa gra", command=self.new_game).grid(row=0, column=9, padx=10)
         self.status = ttk.Label(root, text="Wybierz ustawienia i kliknij Nowa gra", padding=10)
         self.status.grid(row=1, column=0, sticky="w")
         self.board_frame = ttk.Frame(root, padding=10)
         self.board_frame.grid(row=2, column=0)
         self.buttons = []
-        self.board = []
         self.size = 3
         self.max_depth = 6
-        self.current_player = 'X'
-        self.human = 'X'
-        self.computer = 'O'
+        self.human = -1
+        self.computer = 1
+        self.current_player = self.human
         self.game_over = False
+        self.results = queue.Queue()
+        self.token = 0
+        self.worker = None
+        self.engine = None
         self.new_game()
 
     def new_game(self):
+        self.token += 1
+        if self.worker and self.worker.is_alive():
+            self.engine.cancel.set()
+            self.worker.join()
         try:
             self.size = int(self.size_var.get())
         except:
@@ -44,11 +274,13 @@ class TicTacToe:
             self.max_depth = int(self.depth_var.get())
         except:
             self.max_depth = 6
-        self.human = 'X'
-        self.computer = 'O'
+        try:
+            self.time_budget = float(self.time_var.get())
+        except:
+            self.time_budget = 2.0
         self.current_player = self.human if self.first_var.get() == "user" else self.computer
         self.game_over = False
-        self.board = [['' for _ in range(self.size)] for _ in range(self.size)]
+        self.engine = Engine(self.size)
         for widget in self.board_frame.winfo_children():
             widget.destroy()
         self.buttons = [[None]*self.size for _ in range(self.size)]
@@ -61,39 +293,53 @@ class TicTacToe:
         if self.current_player == self.computer:
             self.root.after(200, self.make_computer_move)
 
+    def place(self, move, side):
+        r, c = divmod(move, self.size)
+        self.engine.make(move, side)
+        self.buttons[r][c]['text'] = MARKS[side]
+        self.buttons[r][c]['command']=0
+        if self.engine.winner or not self.engine.empty:
+            self.end_game(self.engine.winner)
+            return False
+        self.current_player = -side
+        self.update_status()
+        return True
+
     def on_click(self, r, c):
         if self.game_over:
             return
         if self.current_player != self.human:
             return
-        if self.board[r][c] != '':
+        move = r*self.size + c
+        if self.engine.occupied() >> move & 1:
             return
-        self.board[r][c] = self.human
-        self.buttons[r][c]['text'] = self.human
-        self.buttons[r][c]['command']=0
-        winner = self.check_winner(self.board)
-        if winner or self.is_full(self.board):
-            self.end_game(winner)
-            return
-        self.current_player = self.computer
-        self.update_status()
-        self.root.after(100, self.make_computer_move)
+        if self.place(move, self.human):
+            self.root.after(100, self.make_computer_move)
 
     def make_computer_move(self):
-        if self.game_over:
+        if self.game_over or self.current_player != self.computer or (self.worker and self.worker.is_alive()):
             return
-        move = self.find_best_move(self.board, self.max_depth)
-        if move:
-            r, c = move
-            self.board[r][c] = self.computer
-            self.buttons[r][c]['text'] = self.computer
-            self.buttons[r][c]['command']=0
-        winner = self.check_winner(self.board)
-        if winner or self.is_full(self.board):
-            self.end_game(winner)
+        self.worker = threading.Thread(target=self.search_worker, daemon=True,
+                                       args=(self.token, self.engine, self.max_depth, self.time_budget))
+        self.worker.start()
+        self.root.after(POLL_MS, self.poll_result, self.token)
+
+    def search_worker(self, token, engine, max_depth, budget):
+        self.results.put((token, engine.iterative_deepening(self.computer, max_depth, budget)))
+
+    def poll_result(self, token):
+        if token != self.token:
             return
-        self.current_player = self.human
-        self.update_status()
+        try:
+            result_token, move = self.results.get_nowait()
+        except queue.Empty:
+            self.root.after(POLL_MS, self.poll_result, token)
+            return
+        if result_token != token:
+            self.root.after(POLL_MS, self.poll_result, token)
+            return
+        if move is not None:
+            self.place(move, self.computer)
 
     def update_status(self):
         if self.game_over:
@@ -115,112 +361,16 @@ class TicTacToe:
             for c in range(self.size):
                 self.buttons[r][c]['state'] = 'disabled'
 
-    def is_full(self, board):
-        for r in range(self.size):
-            for c in range(self.size):
-                if board[r][c] == '':
-                    return False
-        return True
-
-    def check_winner(self, board):
-        target = 3
-
-        for r in range(self.size):
-            for c in range(self.size - target + 1):
-                segment = board[r][c:c+target]
-                if all(cell == self.human for cell in segment):
-                    return self.human
-                if all(cell == self.computer for cell in segment):
-                    return self.computer
-
-        for r in range(self.size - target + 1):
-            for c in range(self.size):
-                segment = [board[r+i][c] for i in range(target)]
-                if all(cell == self.human for cell in segment):
-                    return self.human
-                if all(cell == self.computer for cell in segment):
-                    return self.computer
-
-        for r in range(self.size - target + 1):
-            for c in range(self.size - target + 1):
-                segment = [board[r+i][c+i] for i in range(target)]
-                if all(cell == self.human for cell in segment):
-                    return self.human
-                if all(cell == self.computer for cell in segment):
-                    return self.computer
-
-        for r in range(self.size - target + 1):
-            for c in range(target - 1, self.size):
-                segment = [board[r+i][c-i] for i in range(target)]
-                if all(cell == self.human for cell in segment):
-                    return self.human
-                if all(cell == self.computer for cell in segment):
-                    return self.computer
-
-        return None
-
-
-    def heuristic(self, board):
-        score = 0
-        lines = []
-        for r in range(self.size):
-            lines.append([board[r][c] for c in range(self.size)])
-        for c in range(self.size):
-            lines.append([board[r][c] for r in range(self.size)])
-        lines.append([board[i][i] for i in range(self.size)])
-        lines.append([board[i][self.size-1-i] for i in range(self.size)])
-        for line in lines:
-            if all(cell != self.human for cell in line):
-                cnt = sum(1 for cell in line if cell == self.computer)
-                score += cnt*cnt
-            if all(cell != self.computer for cell in line):
-                cnt = sum(1 for cell in line if cell == self.human)
-                score -= cnt*cnt
-        return score
-
-    def minimax(self, board, depth, maximizing):
-        winner = self.check_winner(board)
-        if winner == self.computer:
-            return 1000 - depth, None
-        if winner == self.human:
-            return -1000 + depth, None
-        if self.is_full(board):
-            return 0, None
-        if depth >= self.max_depth:
-            return self.heuristic(board), None
-        if maximizing:
-            best_score = -math.inf
-            best_move = None
-            for r in range(self.size):
-                for c in range(self.size):
-                    if board[r][c] == '':
-                        board[r][c] = self.computer
-                        score, _ = self.minimax(board, depth+1, False)
-                        board[r][c] = ''
-                        if score > best_score:
-                            best_score = score
-                            best_move = (r, c)
-            return best_score, best_move
-        else:
-            best_score = math.inf
-            best_move = None
-            for r in range(self.size):
-                for c in range(self.size):
-                    if board[r][c] == '':
-                        board[r][c] = self.human
-                        score, _ = self.minimax(board, depth+1, True)
-                        board[r][c] = ''
-                        if score < best_score:
-                            best_score = score
-                            best_move = (r, c)
-            return best_score, best_move
-
-    def find_best_move(self, board, max_depth):
-        self.max_depth = max_depth
-        _, move = self.minimax(board, 0, True)
-        return move
-
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = TicTacToe(root)
-    root.mainloop()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true", help="headless self-play benchmark instead of the GUI")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 7, 10])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3, 4])
+    parser.add_argument("--moves", type=int, default=20, help="maximum moves per self-play game")
+    args = parser.parse_args()
+    if args.bench:
+        benchmark(args.sizes, args.depths, args.moves)
+    else:
+        root = tk.Tk()
+        app = TicTacToe(root)
+        root.mainloop()
@@ -1,3 +1,8 @@
+import argparse
+import itertools
+import math
+import multiprocessing
+import time
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D  
@@ -5,33 +10,28 @@ from mpl_toolkits.mplot3d import Axes3D
 def gauss(x, c, sigma):
     return np.exp(-0.5 * ((x - c) / sigma) ** 2)
 
+MEMBERSHIPS = {
+    'humidity': {'low': (20, 10), 'medium': (45, 12), 'high': (70, 12)},
+    'temperature': {'cold': (12, 3.5), 'comfortable': (20, 4), 'hot': (28, 3.5)},
+    'price': {'cheap': (0.25, 0.08), 'normal': (0.5, 0.08), 'expensive': (0.75, 0.08)},
+}
+
+OUTPUT_MEMBERSHIPS = {'low': (10, 10), 'medium': (45, 12), 'high': (80, 12)}
+
+def memberships(name, x):
+    return {label: gauss(x, c, sigma) for label, (c, sigma) in MEMBERSHIPS[name].items()}
+
 def humidity_memberships(h):
-    return {
-        'low': gauss(h, 20, 10),
-        'medium': gauss(h, 45, 12),
-        'high': gauss(h, 70, 12)
-    }
+    return memberships('humidity', h)
 
 def temperature_memberships(t):
-    return {
-        'cold': gauss(t, 12, 3.5),
-        'comfortable': gauss(t, 20, 4),
-        'hot': gauss(t, 28, 3.5)
-    }
+    return memberships('temperature', t)
 
 def price_memberships(p):
-    return {
-        'cheap': gauss(p, 0.25, 0.08),
-        'normal': gauss(p, 0.5, 0.08),
-        'expensive': gauss(p, 0.75, 0.08)
-    }
+    return memberships('price', p)
 
 INTENSITY_X = np.linspace(0, 100, 400)
-INTENSITY_SETS = {
-    'low': gauss(INTENSITY_X, 10, 10),
-    'medium': gauss(INTENSITY_X, 45, 12),
-    'high': gauss(INTENSITY_X, 80, 12)
-}
+INTENSITY_SETS = {label: gauss(INTENSITY_X, c, sigma) for label, (c, sigma) in OUTPUT_MEMBERSHIPS.items()}
 
 WEIGHTS = {
     'humidity': 1.0,
@@ -39,6 +39,20 @@ WEIGHTS = {
     'price': 0.8
 }
 
+RULES = [
+    ('low', 'cold', 'cheap', 'high', 1.0),
+    ('low', 'comfortable', 'normal', 'high', 0.9),
+    ('low', 'hot', 'expensive', 'medium', 0.7),
+    ('medium', 'cold', 'cheap', 'medium', 0.9),
+    ('medium', 'comfortable', 'normal', 'medium', 0.8),
+    ('medium', 'hot', 'expensive', 'low', 0.6),
+    ('high', 'cold', 'cheap', 'medium', 0.7),
+    ('high', 'comfortable', 'normal', 'low', 0.9),
+    ('high', 'hot', 'expensive', 'low', 1.0),
+]
+
+CHUNK = 2048
+
 def infer_intensity(h, t, p):
     h_m = humidity_memberships(h)
     t_m = temperature_memberships(t)
@@ -46,19 +60,7 @@ def infer_intensity(h, t, p):
 
     aggregated = np.zeros_like(INTENSITY_X)
 
-    rules = [
-        ('low', 'cold', 'cheap', 'high', 1.0),
-        ('low', 'comfortable', 'normal', 'high', 0.9),
-        ('low', 'hot', 'expensive', 'medium', 0.7),
-        ('medium', 'cold', 'cheap', 'medium', 0.9),
-        ('medium', 'comfortable', 'normal', 'medium', 0.8),
-        ('medium', 'hot', 'expensive', 'low', 0.6),
-        ('high', 'cold', 'cheap', 'medium', 0.7),
-        ('high', 'comfortable', 'normal', 'low', 0.9),
-        ('high', 'hot', 'expensive', 'low', 1.0),
-    ]
-
-    for (h_label, t_label, p_label, out_label, base_strength) in rules:
+    for (h_label, t_label, p_label, out_label, base_strength) in RULES:
         mu_h = h_m[h_label] * WEIGHTS['humidity']
         mu_t = t_m[t_label] * WEIGHTS['temperature']
         mu_p = p_m[p_label] * WEIGHTS['price']
@@ -76,17 +78,196 @@ def infer_intensity(h, t, p):
 
     return float(np.sum(aggregated * INTENSITY_X) / denom)
 
-def compute_surface(price, H_steps=60, T_steps=60):
+class FuzzyController:
+    def __init__(self, inputs, weights, outputs, rules, x=INTENSITY_X):
+        self.names = list(inputs)
+        labels = [list(inputs[name]) for name in self.names]
+        self.centres = [np.array([c for c, _ in inputs[name].values()], float) for name in self.names]
+        self.sigmas = [np.array([s for _, s in inputs[name].values()], float) for name in self.names]
+        self.out_labels = list(outputs)
+        self.out_centres = np.array([c for c, _ in outputs.values()], float)
+        self.x = x
+        self.sets = np.stack([gauss(x, c, s) for c, s in outputs.values()])
+        self.area = self.sets.sum(axis=1)
+        self.moment = self.sets @ x
+        self.antecedents = np.array([[labels[v].index(rule[v]) for v in range(len(self.names))] for rule in rules])
+        self.consequents = np.array([self.out_labels.index(rule[-2]) for rule in rules])
+        self.base = np.array([rule[-1] for rule in rules], float) * np.prod([weights[name] for name in self.names])
+        self.fired_by = [np.flatnonzero(self.consequents == k) for k in range(len(self.out_labels))]
+        self.scalar_params = [list(zip(c.tolist(), s.tolist())) for c, s in zip(self.centres, self.sigmas)]
+        self.scalar_rules = list(zip(self.antecedents.tolist(), self.consequents.tolist(), self.base.tolist()))
+        self.scalar_centres = self.out_centres.tolist()
+        self.scalar_area = self.area.tolist()
+        self.scalar_moment = self.moment.tolist()
+
+    def strengths(self, *values):
+        # Strongest rule per output label; rules below 1e-8 do not fire.
+        rule = np.broadcast_to(self.base, (len(values[0]), len(self.base))).copy()
+        for v, x in enumerate(values):
+            rule *= gauss(x[:, None], self.centres[v], self.sigmas[v])[:, self.antecedents[:, v]]
+        rule[rule <= 1e-8] = 0.0
+        out = np.zeros((len(rule), len(self.out_labels)))
+        for k, fired in enumerate(self.fired_by):
+            if len(fired):
+                out[:, k] = rule[:, fired].max(axis=1)
+        return out
+
+    def centroid(self, strengths):
+        aggregated = np.max(strengths[:, :, None] * self.sets, axis=1)
+        denom = aggregated.sum(axis=1)
+        return np.where(denom < 1e-8, 0.0, aggregated @ self.x / np.where(denom < 1e-8, 1.0, denom))
+
+    def mom(self, strengths):
+        # Gaussian output sets peak at 1 on their centres, so the maxima of the
+        # aggregate sit exactly on the centres of the labels with the top strength.
+        top = strengths.max(axis=1, keepdims=True)
+        at_top = (strengths == top) & (top > 0)
+        count = at_top.sum(axis=1)
+        return np.where(count > 0, at_top @ self.out_centres / np.maximum(count, 1), 0.0)
+
+    def sugeno(self, strengths):
+        # Sum-aggregation of scaled output sets, using their precomputed area and first moment.
+        denom = strengths @ self.area
+        return np.where(denom < 1e-8, 0.0, strengths @ self.moment / np.where(denom < 1e-8, 1.0, denom))
+
+    def infer_one(self, *values, method="centroid"):
+        # Plain-Python path for a single sample, where NumPy call overhead would dominate.
+        mu = [[math.exp(-0.5 * ((x - c) / s) ** 2) for c, s in params] for x, params in zip(values, self.scalar_params)]
+        strengths = [0.0] * len(self.out_labels)
+        for antecedent, k, base in self.scalar_rules:
+            strength = base
+            for v, label in enumerate(antecedent):
+                strength *= mu[v][label]
+            if strength > 1e-8 and strength > strengths[k]:
+                strengths[k] = strength
+        if method == "mom":
+            top = max(strengths)
+            centres = [c for c, strength in zip(self.scalar_centres, strengths) if strength == top]
+            return sum(centres) / len(centres) if top > 0 else 0.0
+        if method == "sugeno":
+            denom = sum(strength * area for strength, area in zip(strengths, self.scalar_area))
+            return sum(strength * m for strength, m in zip(strengths, self.scalar_moment)) / denom if denom >= 1e-8 else 0.0
+        aggregated = np.max(np.array(strengths)[:, None] * self.sets, axis=0)
+        denom = aggregated.sum()
+        return float(aggregated @ self.x / denom) if denom >= 1e-8 else 0.0
+
+    def infer(self, *values, method="centroid", chunk=CHUNK):
+        if all(isinstance(v, (int, float)) for v in values):
+            return self.infer_one(*values, method=method)
+        values = np.broadcast_arrays(*(np.asarray(v, float) for v in values))
+        shape = values[0].shape
+        flat = [v.ravel() for v in values]
+        defuzzify = getattr(self, method)
+        out = np.empty(flat[0].size)
+        for start in range(0, out.size, chunk):
+            part = slice(start, start + chunk)
+            out[part] = defuzzify(self.strengths(*(v[part] for v in flat)))
+        return out.reshape(shape)
+
+CONTROLLER = FuzzyController(MEMBERSHIPS, WEIGHTS, OUTPUT_MEMBERSHIPS, RULES)
+DEFUZZIFIERS = ("centroid", "mom", "sugeno")
+
+def infer_intensity_batch(H, T, P, chunk=CHUNK, method="centroid"):
+    return CONTROLLER.infer(H, T, P, method=method, chunk=chunk)
+
+def compute_surface(price, H_steps=60, T_steps=60, method="centroid"):
     H = np.linspace(0, 100, H_steps)
     T = np.linspace(10, 30, T_steps)
     HH, TT = np.meshgrid(H, T)
-    ZZ = np.zeros_like(HH)
-
-    for i in range(HH.shape[0]):
-        for j in range(HH.shape[1]):
-            ZZ[i, j] = infer_intensity(HH[i, j], TT[i, j], price)
+    ZZ = infer_intensity_batch(HH, TT, price, method=method)
     return HH, TT, ZZ
 
+LUT_RANGES = ((0, 100), (10, 30), (0, 1))
+LUT_RESOLUTION = (101, 81, 51)
+
+def lut_axes(resolution=LUT_RESOLUTION):
+    return [np.linspace(lo, hi, n) for (lo, hi), n in zip(LUT_RANGES, resolution)]
+
+def lut_slice(task):
+    H, T, p, method = task
+    HH, TT = np.meshgrid(H, T, indexing='ij')
+    return infer_intensity_batch(HH, TT, p, method=method)
+
+def build_lut(path="cw5_lut.npy", resolution=LUT_RESOLUTION, method="centroid", processes=None):
+    H, T, P = lut_axes(resolution)
+    with multiprocessing.Pool(processes) as pool:
+        slices = pool.map(lut_slice, [(H, T, p, method) for p in P])
+    table = np.stack(slices, axis=-1)
+    np.save(path, table)
+    return load_lut(path)
+
+def load_lut(path="cw5_lut.npy"):
+    return np.load(path, mmap_mode='r')
+
+def lut_interpolate(table, H, T, P):
+    H, T, P = np.broadcast_arrays(np.asarray(H, float), np.asarray(T, float), np.asarray(P, float))
+    index, frac = [], []
+    for x, (lo, hi), n in zip((H, T, P), LUT_RANGES, table.shape):
+        u = np.clip((x - lo) / (hi - lo) * (n - 1), 0, n - 1)
+        i = np.minimum(u.astype(np.intp), n - 2)
+        index.append(i)
+        frac.append(u - i)
+    (i, j, k), (fh, ft, fp) = index, frac
+    out = 0.0
+    for di, wi in ((0, 1 - fh), (1, fh)):
+        for dj, wj in ((0, 1 - ft), (1, ft)):
+            for dk, wk in ((0, 1 - fp), (1, fp)):
+                out = out + wi * wj * wk * table[i + di, j + dj, k + dk]
+    return out
+
+def lut_error(table, samples=100000, method="centroid", seed=0):
+    rng = np.random.default_rng(seed)
+    H, T, P = (rng.uniform(lo, hi, samples) for lo, hi in LUT_RANGES)
+    err = np.abs(lut_interpolate(table, H, T, P) - infer_intensity_batch(H, T, P, method=method))
+    return float(err.max()), float(err.mean()), float(np.percentile(err, 99))
+
+STREAM_CHUNK = 65536
+
+def read_chunks(path, chunk=STREAM_CHUNK, dtype="float64"):
+    # Yields (rows, 3) arrays of humidity, temperature, price; CSV/TXT may have a header line,
+    # .npy is memory-mapped and anything else is read as raw interleaved `dtype` triples.
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode='r')
+        for start in range(0, len(data), chunk):
+            yield np.asarray(data[start:start + chunk], float)
+    elif path.endswith((".csv", ".txt")):
+        with open(path, encoding="utf-8") as f:
+            pending = [f.readline()]
+            try:
+                float(pending[0].split(",")[0])
+            except ValueError:
+                pending = []
+            while True:
+                lines = pending + list(itertools.islice(f, chunk - len(pending)))
+                pending = []
+                if not any(line.strip() for line in lines):
+                    break
+                yield np.loadtxt(lines, delimiter=",", usecols=(0, 1, 2), ndmin=2)
+    else:
+        with open(path, "rb") as f:
+            while True:
+                block = np.fromfile(f, dtype=dtype, count=3 * chunk)
+                if not block.size:
+                    break
+                yield block.reshape(-1, 3).astype(float)
+
+def stream_file(src, dst, chunk=STREAM_CHUNK, method="centroid", table=None, dtype="float64"):
+    text = dst.endswith((".csv", ".txt"))
+    samples = 0
+    t0 = time.perf_counter()
+    with open(dst, "w" if text else "wb") as out:
+        for rows in read_chunks(src, chunk, dtype):
+            H, T, P = rows.T
+            Z = lut_interpolate(table, H, T, P) if table is not None else infer_intensity_batch(H, T, P, method=method)
+            if text:
+                np.savetxt(out, Z, fmt="%.6f")
+            else:
+                Z.astype(dtype).tofile(out)
+            samples += len(rows)
+    seconds = time.perf_counter() - t0
+    print(f"{src} -> {dst}: {samples} samples in {seconds:.2f} s ({samples / max(seconds, 1e-9):.0f} samples/s)")
+    return samples, seconds
+
 def plot_all_prices(prices):
     fig = plt.figure(figsize=(18, 6))
 
@@ -104,5 +285,26 @@ def plot_all_prices(prices):
     plt.show()
 
 if __name__ == "__main__":
-    prices = [0.25, 0.5, 0.75]
-    plot_all_prices(prices)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--build-lut", action="store_true", help="precompute the (humidity, temperature, price) lookup table")
+    parser.add_argument("--lut", default="cw5_lut.npy")
+    parser.add_argument("--resolution", type=int, nargs=3, default=LUT_RESOLUTION, metavar=("H", "T", "P"))
+    parser.add_argument("--method", choices=DEFUZZIFIERS, default="centroid")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--stream", metavar="SRC", help="evaluate a CSV/.npy/raw binary log of (humidity, temperature, price) rows")
+    parser.add_argument("--output", default="intensity.csv", help="text output for .csv/.txt, raw binary otherwise")
+    parser.add_argument("--chunk", type=int, default=STREAM_CHUNK)
+    parser.add_argument("--dtype", default="float64", help="element type of raw binary input and output")
+    parser.add_argument("--use-lut", action="store_true", help="stream through the --lut table instead of exact inference")
+    args = parser.parse_args()
+    if args.stream:
+        table = load_lut(args.lut) if args.use_lut else None
+        stream_file(args.stream, args.output, args.chunk, args.method, table, args.dtype)
+    elif args.build_lut:
+        table = build_lut(args.lut, args.resolution, args.method, args.processes)
+        max_err, mean_err, p99_err = lut_error(table, method=args.method)
+        print(f"{args.lut}: {table.shape}, {table.nbytes / 1e6:.1f} MB, "
+              f"max error {max_err:.4f}, mean error {mean_err:.4f}, p99 error {p99_err:.4f}")
+    else:
+        prices = [0.25, 0.5, 0.75]
+        plot_all_prices(prices)
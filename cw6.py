@@ -2,10 +2,7 @@ import numpy as np
 import sympy as sp
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-import math
-import random
 
-random.seed(0)
 np.random.seed(0)
 
 x = sp.symbols('x')
@@ -35,81 +32,79 @@ if alg_choice not in ('hill', 'sa'):
     alg_choice = 'hill'
 
 iters = max(1, int(input("Liczba iteracji (np. 500):\n") or "500"))
+restarts = max(1, int(input("Liczba restartów (np. 20):\n") or "20"))
 step_init = (b - a) / 50.0
 positions = []
 
-def clip(v):
-    return max(min(v, b), a)
-
 def eval_obj(xx):
     try:
         return float(f_np(xx))
     except Exception:
         return float(sp.N(expr.subs(x, xx)))
 
+def f_vec(xs):
+    try:
+        ys = np.asarray(f_np(xs), dtype=float)
+    except Exception:
+        ys = np.array([eval_obj(xx) for xx in xs])
+    return np.broadcast_to(ys, xs.shape)
+
+def better(y_new, y_old):
+    return y_new < y_old if ext_type == 'min' else y_new > y_old
+
+def not_worse(y_new, y_old):
+    return y_new <= y_old if ext_type == 'min' else y_new >= y_old
+
 def hill_climb(x0, iters, step):
-    pos = []
-    xcur = x0
-    pos.append((xcur, f_np(xcur)))
+    # All restarts advance together; rows of xs/ys are iterations, columns are restarts.
+    xcur = np.asarray(x0, dtype=float)
+    ycur = f_vec(xcur)
+    xs = np.empty((iters + 1, len(xcur)))
+    ys = np.empty_like(xs)
+    xs[0], ys[0] = xcur, ycur
     for i in range(iters):
         s = step * (1 - i / iters) + 1e-9
-        cand1 = clip(xcur + s)
-        cand2 = clip(xcur - s)
-        ycur = f_np(xcur)
-        y1 = f_np(cand1)
-        y2 = f_np(cand2)
-        if ext_type == 'min':
-            if y1 < ycur and y1 <= y2:
-                xcur = cand1
-            elif y2 < ycur and y2 <= y1:
-                xcur = cand2
-        else:
-            if y1 > ycur and y1 >= y2:
-                xcur = cand1
-            elif y2 > ycur and y2 >= y1:
-                xcur = cand2
-        pos.append((xcur, f_np(xcur)))
-    return xcur, pos
+        cand1 = np.clip(xcur + s, a, b)
+        cand2 = np.clip(xcur - s, a, b)
+        y1 = f_vec(cand1)
+        y2 = f_vec(cand2)
+        take1 = better(y1, ycur) & not_worse(y1, y2)
+        take2 = ~take1 & better(y2, ycur) & not_worse(y2, y1)
+        xcur = np.where(take1, cand1, np.where(take2, cand2, xcur))
+        ycur = np.where(take1, y1, np.where(take2, y2, ycur))
+        xs[i + 1], ys[i + 1] = xcur, ycur
+    return xs, ys
 
 def simulated_annealing(x0, iters, T0, cooling, param):
-    pos = []
-    xcur = x0
+    xcur = np.asarray(x0, dtype=float)
+    ycur = f_vec(xcur)
     T = T0
-    pos.append((xcur, f_np(xcur)))
+    xs = np.empty((iters + 1, len(xcur)))
+    ys = np.empty_like(xs)
+    xs[0], ys[0] = xcur, ycur
     for i in range(iters):
         step = step_init * (1 - i / iters) + 1e-6
-        xnew = clip(xcur + random.uniform(-step, step))
-        ycur = f_np(xcur)
-        ynew = f_np(xnew)
+        xnew = np.clip(xcur + np.random.uniform(-step, step, len(xcur)), a, b)
+        ynew = f_vec(xnew)
         delta = ynew - ycur
-        accept = False
-        if (ext_type == 'min' and delta < 0) or (ext_type == 'max' and delta > 0):
-            accept = True
-        else:
-            if T > 1e-12:
-                p = math.exp(-abs(delta) / T)
-                if random.random() < p:
-                    accept = True
-        if accept:
-            xcur = xnew
-        pos.append((xcur, f_np(xcur)))
+        accept = better(ynew, ycur)
+        if T > 1e-12:
+            accept |= np.random.random(len(xcur)) < np.exp(-np.abs(delta) / T)
+        xcur = np.where(accept, xnew, xcur)
+        ycur = np.where(accept, ynew, ycur)
+        xs[i + 1], ys[i + 1] = xcur, ycur
         if cooling == 'geom':
             alpha = param
             T = T * alpha
         else:
             T = max(0.0, T - param)
-    return xcur, pos
+    return xs, ys
 
 positions.clear()
-best_x, best_y, best_path = None, float('inf') if ext_type == 'min' else -float('inf'), []
+x0 = np.random.uniform(a, b, restarts)
 
 if alg_choice == 'hill':
-    for _ in range(20):  
-        x0 = random.uniform(a, b)
-        x_candidate, path = hill_climb(x0, iters, step_init)
-        y_candidate = f_np(x_candidate)
-        if (ext_type == 'min' and y_candidate < best_y) or (ext_type == 'max' and y_candidate > best_y):
-            best_x, best_y, best_path = x_candidate, y_candidate, path
+    xs, ys = hill_climb(x0, iters, step_init)
 
 else:
     T0 = float(input("Początkowa temperatura T0 (np. 1.0):\n") or "1.0")
@@ -122,12 +117,12 @@ else:
         param = dec
         cooling = 'lin'
 
-    for _ in range(20):
-        x0 = random.uniform(a, b)
-        x_candidate, path = simulated_annealing(x0, iters, T0, cooling, param)
-        y_candidate = f_np(x_candidate)
-        if (ext_type == 'min' and y_candidate < best_y) or (ext_type == 'max' and y_candidate > best_y):
-            best_x, best_y, best_path = x_candidate, y_candidate, path
+    xs, ys = simulated_annealing(x0, iters, T0, cooling, param)
+
+final = np.where(np.isnan(ys[-1]), np.inf if ext_type == 'min' else -np.inf, ys[-1])
+best = int(np.argmin(final) if ext_type == 'min' else np.argmax(final))
+best_x, best_y = float(xs[-1, best]), float(ys[-1, best])
+best_path = list(zip(xs[:, best].tolist(), ys[:, best].tolist()))
 
 res_x, res_y = best_x, best_y
 positions = best_path  
@@ -137,9 +132,9 @@ print("\n=== Wynik końcowy ===")
 print(f"x* = {res_x:.6f}, y* = {res_y:.6f}")
 
 xs_plot = np.linspace(a, b, 1000)
-ys_plot = np.array([f_np(xx) for xx in xs_plot])
+ys_plot = f_vec(xs_plot)
 pos_x = [p[0] for p in positions]
-pos_y = [float(f_np(p[0])) for p in positions]
+pos_y = [p[1] for p in positions]
 
 fig, ax = plt.subplots()
 ax.set_xlim(a, b)